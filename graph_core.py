@@ -0,0 +1,294 @@
+"""
+Shared core for the recipe knowledge graph scripts.
+
+Holds TheMealDB fetch pipeline and the N-Triples writer used by
+graph_generate.py. The namespaces live in graph_namespaces.py.
+
+Data Source: TheMealDB (https://www.themealdb.com)
+API: https://www.themealdb.com/api.php
+License: Free for non-commercial use with attribution
+"""
+
+import orjson
+import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rdflib import RDF, RDFS
+from urllib.parse import quote
+from functools import lru_cache
+
+from graph_namespaces import CATEGORY, CUISINE, INGREDIENT, MEAL, RECIPE
+
+# Pre-rendered N-Triples terms for the fixed classes and predicates
+RDF_TYPE = f"<{RDF.type}>"
+RDFS_LABEL = f"<{RDFS.label}>"
+MEAL_CLASS = f"<{RECIPE.Meal}>"
+INGREDIENT_CLASS = f"<{RECIPE.Ingredient}>"
+INGREDIENT_USAGE_CLASS = f"<{RECIPE.IngredientUsage}>"
+CATEGORY_CLASS = f"<{RECIPE.Category}>"
+CUISINE_CLASS = f"<{RECIPE.Cuisine}>"
+HAS_NAME = f"<{RECIPE.hasName}>"
+HAS_INSTRUCTIONS = f"<{RECIPE.hasInstructions}>"
+HAS_THUMBNAIL = f"<{RECIPE.hasThumbnail}>"
+HAS_YOUTUBE_LINK = f"<{RECIPE.hasYoutubeLink}>"
+BELONGS_TO_CATEGORY = f"<{RECIPE.belongsToCategory}>"
+BELONGS_TO_CUISINE = f"<{RECIPE.belongsToCuisine}>"
+HAS_INGREDIENT = f"<{RECIPE.hasIngredient}>"
+HAS_INGREDIENT_USAGE = f"<{RECIPE.hasIngredientUsage}>"
+USES_INGREDIENT = f"<{RECIPE.usesIngredient}>"
+INGREDIENT_NAME = f"<{RECIPE.ingredientName}>"
+INGREDIENT_MEASURE = f"<{RECIPE.ingredientMeasure}>"
+
+# Rendered category and cuisine IRIs keyed by raw API label, and canonical
+# ingredient IRIs keyed by lowercased ingredient name
+_category_cache = {}
+_cuisine_cache = {}
+_ingredient_cache = {}
+
+# (ingredient key, measure key, index) for the 20 ingredient slots per meal
+_ING_KEYS = tuple(
+    (f"strIngredient{i}", f"strMeasure{i}", i) for i in range(1, 21)
+)
+
+# TheMealDB API settings
+RANDOM_MEAL_URL = "https://www.themealdb.com/api/json/v1/1/random.php"
+MAX_WORKERS = 8
+REQUESTS_PER_SECOND = 8
+
+# Shared HTTP session so worker threads reuse pooled keep-alive connections
+# instead of paying a fresh TCP + TLS handshake per request
+SESSION = requests.Session()
+SESSION.headers.update({"Accept-Encoding": "gzip"})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",)
+    )
+))
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests per second."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_meal(limiter):
+    """Fetch a single random meal, waiting on the shared rate limiter."""
+    limiter.acquire()
+    response = SESSION.get(RANDOM_MEAL_URL, timeout=5)
+    response.raise_for_status()
+    # orjson decodes the raw bytes directly, skipping requests' text
+    # decoding and the stdlib json parser
+    meal = orjson.loads(response.content)["meals"][0]
+    # Reject malformed payloads here so they are reported per meal instead
+    # of failing later in the caller or the writer
+    if not isinstance(meal, dict) or "idMeal" not in meal:
+        raise ValueError(f"unexpected meal payload: {meal!r}")
+    return meal
+
+
+def fetch_random_meals(count=50, max_workers=MAX_WORKERS,
+                       rate=REQUESTS_PER_SECOND):
+    """Fetch random meals from TheMealDB API concurrently.
+    
+    Meals are yielded as soon as they arrive, so callers can write each
+    one out without holding the whole batch in memory.
+    """
+    fetched = 0
+    print(f"Fetching {count} meals from TheMealDB API...")
+    
+    # Requests are I/O-bound, so a small thread pool overlaps the network
+    # round trips while the token bucket keeps us within the rate limit.
+    limiter = RateLimiter(rate, burst=max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch_meal, limiter): i for i in range(count)
+        }
+        for future in as_completed(futures):
+            i = futures.pop(future)
+            try:
+                meal = future.result()
+            except (requests.RequestException, orjson.JSONDecodeError,
+                    KeyError, IndexError, TypeError, ValueError) as e:
+                print(f"Error fetching meal {i+1}: {e}")
+                continue
+            fetched += 1
+            print(f"Fetched: {meal.get('strMeal')} ({fetched}/{count})")
+            yield meal
+
+
+def create_uri_ref(namespace, value):
+    """Create a safe URI reference."""
+    if value:
+        safe_value = quote(value.strip().replace(" ", "_"))
+        return namespace[safe_value]
+    return None
+
+
+def cached_uri_ref(cache, namespace, value):
+    """Return the rendered IRI for a repeated label, building it once."""
+    uri = cache.get(value)
+    if uri is None:
+        uri = cache[value] = f"<{create_uri_ref(namespace, value)}>"
+    return uri
+
+
+def nt_literal(value):
+    """Render a string as an escaped N-Triples literal."""
+    return '"%s"' % value.replace("\\", "\\\\").replace(
+        "\n", "\\n"
+    ).replace('"', '\\"').replace("\r", "\\r")
+
+
+@lru_cache(maxsize=4096)
+def nt_label(value):
+    """Render a short, frequently repeated string as an N-Triples literal.
+    
+    Meant for values written on every meal that repeat across meals, such
+    as ingredient measures ("1 tsp"). Labels written once per output and
+    unique per-meal text should use nt_literal.
+    """
+    return nt_literal(value)
+
+
+def write_meal_nt(out, meal, declared, ingredient_names):
+    """Write a meal and its properties to an open N-Triples file.
+    
+    Meals, and the type and label triples of categories, cuisines and
+    canonical ingredients, are written only the first time each IRI is
+    seen, tracked through `declared`. Ingredient names are not written
+    here: each spelling seen is folded into `ingredient_names` (IRI to
+    name) for write_ingredient_names_nt. Returns the number of triples
+    written.
+    """
+    meal_id = meal["idMeal"]
+    meal_uri = f"<{MEAL}{meal_id}>"
+    if meal_uri in declared:
+        return 0
+    declared.add(meal_uri)
+    
+    # Collect rows and write them with a single call per meal
+    rows = []
+    add = rows.append
+    
+    # Add meal as instance of Meal class
+    add(f"{meal_uri} {RDF_TYPE} {MEAL_CLASS} .\n")
+    
+    # Add basic properties
+    if meal.get("strMeal"):
+        add(f"{meal_uri} {HAS_NAME} {nt_literal(meal['strMeal'])} .\n")
+    
+    if meal.get("strInstructions"):
+        add(f"{meal_uri} {HAS_INSTRUCTIONS} "
+            f"{nt_literal(meal['strInstructions'])} .\n")
+    
+    if meal.get("strMealThumb"):
+        add(f"{meal_uri} {HAS_THUMBNAIL} "
+            f"{nt_literal(meal['strMealThumb'])} .\n")
+    
+    if meal.get("strYoutube"):
+        add(f"{meal_uri} {HAS_YOUTUBE_LINK} "
+            f"{nt_literal(meal['strYoutube'])} .\n")
+    
+    # Add category
+    if meal.get("strCategory"):
+        category_uri = cached_uri_ref(
+            _category_cache, CATEGORY, meal["strCategory"]
+        )
+        if category_uri not in declared:
+            declared.add(category_uri)
+            add(f"{category_uri} {RDF_TYPE} {CATEGORY_CLASS} .\n")
+            add(f"{category_uri} {RDFS_LABEL} "
+                f"{nt_literal(meal['strCategory'])} .\n")
+        add(f"{meal_uri} {BELONGS_TO_CATEGORY} {category_uri} .\n")
+    
+    # Add cuisine/area
+    if meal.get("strArea"):
+        cuisine_uri = cached_uri_ref(_cuisine_cache, CUISINE, meal["strArea"])
+        if cuisine_uri not in declared:
+            declared.add(cuisine_uri)
+            add(f"{cuisine_uri} {RDF_TYPE} {CUISINE_CLASS} .\n")
+            add(f"{cuisine_uri} {RDFS_LABEL} "
+                f"{nt_literal(meal['strArea'])} .\n")
+        add(f"{meal_uri} {BELONGS_TO_CUISINE} {cuisine_uri} .\n")
+    
+    # Add ingredients. Each distinct ingredient name maps to one shared
+    # IRI; a measure is attached through a per-meal usage blank node only
+    # when the meal gives one.
+    get = meal.get
+    strip = str.strip
+    linked = set()
+    for name_key, measure_key, i in _ING_KEYS:
+        ingredient_name = strip(get(name_key) or "")
+        
+        if ingredient_name:
+            # Key on the lowercased, whitespace-collapsed name so "salt" and
+            # "Salt" share one node; the smallest spelling is kept as the
+            # label so it does not depend on which meal arrives first
+            ingredient_key = " ".join(ingredient_name.lower().split())
+            ingredient_uri = cached_uri_ref(
+                _ingredient_cache, INGREDIENT, ingredient_key
+            )
+            if ingredient_uri not in declared:
+                declared.add(ingredient_uri)
+                add(f"{ingredient_uri} {RDF_TYPE} {INGREDIENT_CLASS} .\n")
+                ingredient_names[ingredient_uri] = ingredient_name
+            elif ingredient_name < ingredient_names[ingredient_uri]:
+                ingredient_names[ingredient_uri] = ingredient_name
+            
+            if ingredient_uri not in linked:
+                linked.add(ingredient_uri)
+                add(f"{meal_uri} {HAS_INGREDIENT} {ingredient_uri} .\n")
+            
+            ingredient_measure = strip(get(measure_key) or "")
+            if ingredient_measure:
+                usage_node = f"_:m{meal_id}i{i}"
+                add(f"{usage_node} {RDF_TYPE} {INGREDIENT_USAGE_CLASS} .\n")
+                add(f"{usage_node} {USES_INGREDIENT} {ingredient_uri} .\n")
+                add(f"{usage_node} {INGREDIENT_MEASURE} "
+                    f"{nt_label(ingredient_measure)} .\n")
+                add(f"{meal_uri} {HAS_INGREDIENT_USAGE} {usage_node} .\n")
+    
+    out.write("".join(rows))
+    return len(rows)
+
+
+def write_ingredient_names_nt(out, ingredient_names):
+    """Write the collected ingredient name triples once all meals are in.
+    
+    Returns the number of triples written.
+    """
+    out.write("".join(
+        f"{ingredient_uri} {INGREDIENT_NAME} {nt_literal(name)} .\n"
+        for ingredient_uri, name in ingredient_names.items()
+    ))
+    return len(ingredient_names)
@@ -12,238 +12,157 @@ Author: Abhigyan Tripathi
 Date: October 2025
 """
 
-import requests
-import time
-from rdflib import Graph, Namespace, RDF, RDFS, Literal, URIRef
-from urllib.parse import quote
+from rdflib import Graph, RDFS
 import matplotlib.pyplot as plt
-import networkx as nx
-from collections import defaultdict
-
-# Define namespaces
-RECIPE = Namespace("http://example.org/recipe/")
-MEAL = Namespace("http://example.org/meal/")
-INGREDIENT = Namespace("http://example.org/ingredient/")
-CATEGORY = Namespace("http://example.org/category/")
-CUISINE = Namespace("http://example.org/cuisine/")
-
-# Initialize graph
-g = Graph()
-g.bind("recipe", RECIPE)
-g.bind("meal", MEAL)
-g.bind("ingredient", INGREDIENT)
-g.bind("category", CATEGORY)
-g.bind("cuisine", CUISINE)
-
-
-def fetch_random_meals(count=50):
-    """Fetch random meals from TheMealDB API."""
-    meals = []
-    print(f"Fetching {count} meals from TheMealDB API...")
-    
-    for i in range(count):
-        try:
-            response = requests.get(
-                "https://www.themealdb.com/api/json/v1/1/random.php"
-            )
-            if response.status_code == 200:
-                meal = response.json()["meals"][0]
-                meals.append(meal)
-                print(f"Fetched: {meal['strMeal']} ({i+1}/{count})")
-            time.sleep(0.5)  # Rate limiting
-        except Exception as e:
-            print(f"Error fetching meal {i+1}: {e}")
-    
-    return meals
-
-
-def create_uri_ref(namespace, value):
-    """Create a safe URI reference."""
-    if value:
-        safe_value = quote(value.strip().replace(" ", "_"))
-        return namespace[safe_value]
-    return None
-
-
-def add_meal_to_graph(meal):
-    """Add a meal and its properties to the RDF graph."""
-    meal_id = meal["idMeal"]
-    meal_uri = MEAL[meal_id]
-    
-    # Add meal as instance of Meal class
-    g.add((meal_uri, RDF.type, RECIPE.Meal))
-    
-    # Add basic properties
-    if meal.get("strMeal"):
-        g.add((meal_uri, RECIPE.hasName, Literal(meal["strMeal"])))
-    
-    if meal.get("strInstructions"):
-        g.add((meal_uri, RECIPE.hasInstructions, 
-               Literal(meal["strInstructions"])))
-    
-    if meal.get("strMealThumb"):
-        g.add((meal_uri, RECIPE.hasThumbnail, Literal(meal["strMealThumb"])))
-    
-    if meal.get("strYoutube"):
-        g.add((meal_uri, RECIPE.hasYoutubeLink, Literal(meal["strYoutube"])))
-    
-    # Add category
-    if meal.get("strCategory"):
-        category_uri = create_uri_ref(CATEGORY, meal["strCategory"])
-        g.add((category_uri, RDF.type, RECIPE.Category))
-        g.add((category_uri, RDFS.label, Literal(meal["strCategory"])))
-        g.add((meal_uri, RECIPE.belongsToCategory, category_uri))
-    
-    # Add cuisine/area
-    if meal.get("strArea"):
-        cuisine_uri = create_uri_ref(CUISINE, meal["strArea"])
-        g.add((cuisine_uri, RDF.type, RECIPE.Cuisine))
-        g.add((cuisine_uri, RDFS.label, Literal(meal["strArea"])))
-        g.add((meal_uri, RECIPE.belongsToCuisine, cuisine_uri))
-    
-    # Add ingredients
-    for i in range(1, 21):
-        ingredient_name = meal.get(f"strIngredient{i}")
-        ingredient_measure = meal.get(f"strMeasure{i}")
-        
-        if ingredient_name and ingredient_name.strip():
-            ingredient_uri = URIRef(
-                f"{INGREDIENT}{meal_id}_ingredient_{i}"
-            )
-            
-            g.add((ingredient_uri, RDF.type, RECIPE.Ingredient))
-            g.add((ingredient_uri, RECIPE.ingredientName, 
-                   Literal(ingredient_name.strip())))
-            
-            if ingredient_measure and ingredient_measure.strip():
-                g.add((ingredient_uri, RECIPE.ingredientMeasure, 
-                       Literal(ingredient_measure.strip())))
-            
-            g.add((meal_uri, RECIPE.hasIngredient, ingredient_uri))
-
-
-def visualize_knowledge_graph(rdf_graph, output_file="recipe_kg_visualization.png"):
-    """Generate and export a visualization of the knowledge graph."""
+from matplotlib.collections import LineCollection
+import numpy as np
+
+from graph_core import (
+    fetch_random_meals, write_ingredient_names_nt, write_meal_nt
+)
+from graph_namespaces import RECIPE
+
+# Node types in the visualization, ordered from the innermost shell out
+NODE_TYPES = ('cuisine', 'category', 'meal', 'ingredient')
+
+# Predicates linking two entity nodes, mapped to the type code of their
+# object; every subject is a meal. Other predicates have literal or class
+# objects and are not drawn.
+MEAL_NODE = NODE_TYPES.index('meal')
+STRUCTURAL_PREDICATES = {
+    RECIPE.belongsToCuisine: NODE_TYPES.index('cuisine'),
+    RECIPE.belongsToCategory: NODE_TYPES.index('category'),
+    RECIPE.hasIngredient: NODE_TYPES.index('ingredient')
+}
+
+
+def shell_layout(shells, num_nodes, scale=1.0):
+    """Position nodes on concentric circles, one circle per shell.
+    
+    `shells` holds arrays of node ids; returns a (num_nodes, 2) array of
+    coordinates indexed by node id. Angles for a whole shell are computed
+    in one NumPy call, matching networkx.shell_layout's geometry.
+    """
+    pos = np.zeros((num_nodes, 2))
+    if not shells:
+        return pos
+    
+    radius_bump = scale / len(shells)
+    radius = 0.0 if len(shells[0]) == 1 else radius_bump
+    rotate = np.pi / len(shells)
+    first_theta = rotate
+    for nodes in shells:
+        theta = np.linspace(0, 2 * np.pi, len(nodes), endpoint=False)
+        theta += first_theta
+        pos[nodes] = radius * np.column_stack([np.cos(theta), np.sin(theta)])
+        radius += radius_bump
+        first_theta += rotate
+    return pos
+
+
+def visualize_knowledge_graph(rdf_graph, output_file="recipe_kg_visualization.png",
+                              dpi=100):
+    """Generate and export a visualization of the knowledge graph.
+    
+    The format follows the file extension; an ``.svg`` output is written
+    as vector geometry and ignores `dpi`.
+    """
     print("\nGenerating knowledge graph visualization...")
     
-    # Create NetworkX graph
-    nx_graph = nx.DiGraph()
-    
-    # Track node types for coloring
-    node_types = defaultdict(set)
-    node_labels = {}
+    # Nodes are interned to integer ids; their type codes (indexes into
+    # NODE_TYPES) and the edges are kept as parallel arrays rather than
+    # per-type sets of IRI strings. Nodes are keyed by the RDF term itself,
+    # so no str() copy of each IRI is made while building the arrays.
+    node_id = {}
+    node_type = []
+    edge_list = []
+    
+    def intern_node(term, code):
+        """Return the id of a node, registering it with type `code`."""
+        index = node_id.get(term)
+        if index is None:
+            index = node_id[term] = len(node_type)
+            node_type.append(code)
+        return index
+    
+    # Add nodes and edges from RDF graph. Only the predicate-indexed
+    # structural triples are visited; literal-valued properties such as
+    # names and instructions never reach the loop, and each node's type
+    # follows from the predicate it appears with.
+    for pred, obj_code in STRUCTURAL_PREDICATES.items():
+        for subj, _, obj in rdf_graph.triples((None, pred, None)):
+            edge_list.append(
+                (intern_node(subj, MEAL_NODE), intern_node(obj, obj_code))
+            )
     
-    # Add nodes and edges from RDF graph
-    for subj, pred, obj in rdf_graph:
-        subj_str = str(subj)
-        pred_str = str(pred).split("/")[-1].split("#")[-1]
-        obj_str = str(obj)
-        
-        # Determine node types
-        if str(MEAL) in subj_str:
-            node_types['meal'].add(subj_str)
-        elif str(CATEGORY) in subj_str:
-            node_types['category'].add(subj_str)
-        elif str(CUISINE) in subj_str:
-            node_types['cuisine'].add(subj_str)
-        elif str(INGREDIENT) in subj_str:
-            node_types['ingredient'].add(subj_str)
-        
-        # Skip RDF.type and RDFS predicates
-        if pred in [RDF.type, RDFS.label]:
-            continue
-        
-        # Skip literal objects for cleaner visualization
-        if isinstance(obj, Literal):
-            # Store labels for display
-            if pred_str in ['hasName', 'label', 'ingredientName']:
-                node_labels[subj_str] = str(obj)[:20]
-            continue
-        
-        # Add edge only if both nodes will be in the graph
-        if str(CATEGORY) in obj_str:
-            node_types['category'].add(obj_str)
-        elif str(CUISINE) in obj_str:
-            node_types['cuisine'].add(obj_str)
-        elif str(INGREDIENT) in obj_str:
-            node_types['ingredient'].add(obj_str)
-        elif str(MEAL) in obj_str:
-            node_types['meal'].add(obj_str)
-        else:
-            # Skip objects that aren't our entity types
-            continue
-        
-        # Add edge
-        nx_graph.add_edge(subj_str, obj_str, label=pred_str)
+    node_terms = list(node_id)
+    types = np.array(node_type, dtype=np.int8)
+    edges = np.array(edge_list, dtype=np.int32).reshape(-1, 2)
+    nodes_by_type = [
+        np.flatnonzero(types == code) for code in range(len(NODE_TYPES))
+    ]
     
     # Set up visualization
     plt.figure(figsize=(20, 16))
+    ax = plt.gca()
     
-    # Use shell_layout (doesn't require scipy)
-    # Organize nodes in shells by type
-    shells = [
-        list(node_types.get('cuisine', [])),
-        list(node_types.get('category', [])),
-        list(node_types.get('meal', [])),
-        list(node_types.get('ingredient', []))
-    ]
-    shells = [shell for shell in shells if shell]  # Remove empty shells
-    
-    try:
-        pos = nx.shell_layout(nx_graph, nlist=shells)
-    except:
-        # Fallback to circular layout if shell fails
-        pos = nx.circular_layout(nx_graph)
+    # Organize nodes in shells by type, skipping empty shells
+    shells = [nodes for nodes in nodes_by_type if len(nodes)]
+    pos = shell_layout(shells, len(types))
     
     # Define colors for different node types
     colors = {
         'meal': '#FF6B6B',
         'category': '#4ECDC4',
         'cuisine': '#45B7D1',
-        'ingredient': '#FFA07A',
-        'default': '#95E1D3'
+        'ingredient': '#FFA07A'
     }
     
-    # Draw nodes by type
-    for node_type, nodes in node_types.items():
-        nx.draw_networkx_nodes(
-            nx_graph,
-            pos,
-            nodelist=list(nodes),
-            node_color=colors.get(node_type, colors['default']),
-            node_size=500 if node_type in ['category', 'cuisine'] else 100,
+    # Draw nodes by type, one scatter call per type
+    for name, nodes in zip(NODE_TYPES, nodes_by_type):
+        if not len(nodes):
+            continue
+        ax.scatter(
+            pos[nodes, 0],
+            pos[nodes, 1],
+            s=500 if name in ['category', 'cuisine'] else 100,
+            c=colors[name],
             alpha=0.8,
-            label=node_type.capitalize()
+            label=name.capitalize(),
+            zorder=2
         )
     
-    # Draw edges
-    nx.draw_networkx_edges(
-        nx_graph,
-        pos,
-        edge_color='gray',
-        arrows=True,
-        arrowsize=10,
+    # Draw all edges as one LineCollection rather than one arrow patch per
+    # edge; direction is implied by the shells (meals point outward)
+    segments = pos.astype(np.float32)[edges]
+    ax.add_collection(LineCollection(
+        segments,
+        colors='gray',
         alpha=0.3,
-        width=0.5
-    )
+        linewidths=0.5,
+        zorder=1
+    ))
     
     # Add labels for category and cuisine nodes
-    label_nodes = {
-        node: node_labels.get(node, node.split("/")[-1][:15])
-        for node in list(node_types.get('category', [])) + list(node_types.get('cuisine', []))
-    }
-    nx.draw_networkx_labels(
-        nx_graph,
-        pos,
-        labels=label_nodes,
-        font_size=8,
-        font_weight='bold'
-    )
+    for name in ['category', 'cuisine']:
+        for node in nodes_by_type[NODE_TYPES.index(name)]:
+            term = node_terms[node]
+            label = rdf_graph.value(term, RDFS.label)
+            ax.text(
+                pos[node, 0],
+                pos[node, 1],
+                str(label)[:20] if label else term.split("/")[-1][:15],
+                fontsize=8,
+                fontweight='bold',
+                horizontalalignment='center',
+                verticalalignment='center',
+                clip_on=True
+            )
     
     plt.title(
         "Recipe Knowledge Graph Visualization\n"
-        f"Nodes: {nx_graph.number_of_nodes()} | "
-        f"Edges: {nx_graph.number_of_edges()}",
+        f"Nodes: {len(types)} | "
+        f"Edges: {len(edges)}",
         fontsize=16,
         fontweight='bold',
         pad=20
@@ -253,32 +172,35 @@ def visualize_knowledge_graph(rdf_graph, output_file="recipe_kg_visualization.pn
     plt.tight_layout()
     
     # Save the figure
-    plt.savefig(output_file, dpi=300, bbox_inches='tight', facecolor='white')
+    plt.savefig(output_file, dpi=dpi, bbox_inches='tight', facecolor='white')
     print(f"Visualization saved: {output_file}")
     plt.close()
 
-def main():
+def main(count=50, visualize=True):
     print("=== RDFS Recipe Knowledge Graph Generator ===\n")
     
-    # Fetch meals
-    meals = fetch_random_meals(count=50)
-    
-    print(f"\n{len(meals)} meals fetched. Building knowledge graph...\n")
-    
-    # Add meals to graph
-    for meal in meals:
-        add_meal_to_graph(meal)
-    
-    # Serialize to Turtle file
-    output_file = "recipe_knowledge_graph.ttl"
-    g.serialize(destination=output_file, format="turtle")
+    # Stream each meal to N-Triples as soon as it is fetched; only the set
+    # of declared IRIs and one name per ingredient are kept in memory, and
+    # the names are written once every spelling has been seen
+    output_file = "recipe_knowledge_graph.nt"
+    declared = set()
+    ingredient_names = {}
+    total_triples = 0
+    with open(output_file, "w", encoding="utf-8") as out:
+        for meal in fetch_random_meals(count=count):
+            total_triples += write_meal_nt(out, meal, declared,
+                                           ingredient_names)
+        total_triples += write_ingredient_names_nt(out, ingredient_names)
     
     print(f"\nKnowledge graph generated successfully!")
     print(f"Output: {output_file}")
-    print(f"Total triples: {len(g)}")
+    print(f"Total triples: {total_triples}")
     
-    # Generate visualization
-    visualize_knowledge_graph(g, "recipe_knowledge_graph.png")
+    # Generate visualization from a second pass over the written file
+    if visualize:
+        g = Graph()
+        g.parse(output_file, format="nt")
+        visualize_knowledge_graph(g, "recipe_knowledge_graph.png")
     
     print("\nAll files exported successfully!")
 
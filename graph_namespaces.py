@@ -0,0 +1,15 @@
+"""
+Namespaces for the recipe knowledge graph.
+
+Kept free of any dependency beyond rdflib so that graph_query.py can be
+run without the fetch pipeline's HTTP and JSON libraries installed.
+"""
+
+from rdflib import Namespace
+
+# Define namespaces
+RECIPE = Namespace("http://example.org/recipe/")
+MEAL = Namespace("http://example.org/meal/")
+INGREDIENT = Namespace("http://example.org/ingredient/")
+CATEGORY = Namespace("http://example.org/category/")
+CUISINE = Namespace("http://example.org/cuisine/")
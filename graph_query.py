@@ -1,106 +1,173 @@
-from rdflib import Graph
+import os
+import pickle
+from collections import Counter
+from itertools import islice
+
+from rdflib import Graph, RDF, RDFS
+
+from graph_namespaces import RECIPE
+
+GRAPH_FILE = "recipe_knowledge_graph.nt"
+CACHE_FILE = GRAPH_FILE + ".pkl"
+
+
+def load_graph(path=GRAPH_FILE, cache_path=CACHE_FILE):
+    """Load the graph, reusing a pickled copy while it is newer than `path`.
+    
+    Unpickling the in-memory store skips re-parsing the RDF file on every
+    run; the cache is rebuilt whenever the source file changes. A cache
+    that cannot be read (corrupt, or written by another rdflib version)
+    falls back to parsing, and failing to write the cache is not fatal.
+    """
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) >= os.path.getmtime(path)):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError,
+                ImportError, ValueError, OSError) as e:
+            print(f"Ignoring unreadable graph cache {cache_path}: {e}")
+    
+    graph = Graph()
+    graph.parse(path, format="nt")
+    
+    # Write to a temporary file first so an interrupted run never leaves a
+    # truncated cache behind; the temporary file is removed if the dump or
+    # the rename does not complete
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(graph, f, protocol=5)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError) as e:
+        print(f"Could not write graph cache {cache_path}: {e}")
+    finally:
+        if os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    return graph
+
 
 # Load the knowledge graph
-g = Graph()
-g.parse("recipe_knowledge_graph.ttl", format="turtle")
+g = load_graph()
 
 print(f"Loaded graph with {len(g)} triples\n")
 
-# Example SPARQL Queries
-
-# Query 1: List all meals with their names
-query1 = """
-PREFIX recipe: <http://example.org/recipe/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT ?meal ?name
-WHERE {
-    ?meal a recipe:Meal ;
-          recipe:hasName ?name .
+# Reverse index from cuisine label to cuisine IRI, built once so cuisine
+# lookups are a dict probe rather than a scan over every label triple
+label_to_cuisine = {
+    str(label): cuisine
+    for cuisine in g.subjects(RDF.type, RECIPE.Cuisine)
+    for label in g.objects(cuisine, RDFS.label)
 }
-LIMIT 10
-"""
 
+# Example queries
+#
+# Each query is a single basic graph pattern, so it is answered by walking
+# the store's triple indexes directly instead of going through the SPARQL
+# parser and algebra evaluator. The equivalent SPARQL is kept above each
+# query (prefixes: recipe: <http://example.org/recipe/>, rdfs:).
+
+# Query 1: List all meals with their names
+#
+#   SELECT ?meal ?name
+#   WHERE {
+#       ?meal a recipe:Meal ;
+#             recipe:hasName ?name .
+#   }
+#   LIMIT 10
 print("=== Query 1: List of Meals ===")
-results = g.query(query1)
-for row in results:
-    print(f"  {row.name}")
+meal_names = (
+    name
+    for meal in g.subjects(RDF.type, RECIPE.Meal)
+    for name in g.objects(meal, RECIPE.hasName)
+)
+for name in islice(meal_names, 10):
+    print(f"  {name}")
 
 # Query 2: Find meals by cuisine
-query2 = """
-PREFIX recipe: <http://example.org/recipe/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT ?mealName ?cuisineName
-WHERE {
-    ?meal a recipe:Meal ;
-          recipe:hasName ?mealName ;
-          recipe:belongsToCuisine ?cuisine .
-    ?cuisine rdfs:label ?cuisineName .
-    FILTER(?cuisineName = "Italian")
-}
-"""
-
+#
+#   SELECT ?mealName ?cuisineName
+#   WHERE {
+#       ?meal a recipe:Meal ;
+#             recipe:hasName ?mealName ;
+#             recipe:belongsToCuisine ?cuisine .
+#       ?cuisine rdfs:label ?cuisineName .
+#       FILTER(?cuisineName = "Italian")
+#   }
 print("\n=== Query 2: Italian Meals ===")
-results = g.query(query2)
-for row in results:
-    print(f"  {row.mealName}")
+italian = label_to_cuisine.get("Italian")
+if italian is not None:
+    for meal in g.subjects(RECIPE.belongsToCuisine, italian):
+        if (meal, RDF.type, RECIPE.Meal) in g:
+            for name in g.objects(meal, RECIPE.hasName):
+                print(f"  {name}")
 
 # Query 3: List ingredients for a specific meal
-query3 = """
-PREFIX recipe: <http://example.org/recipe/>
-
-SELECT ?ingredientName ?measure
-WHERE {
-    ?meal a recipe:Meal ;
-          recipe:hasName ?mealName ;
-          recipe:hasIngredient ?ingredient .
-    ?ingredient recipe:ingredientName ?ingredientName ;
-                recipe:ingredientMeasure ?measure .
-}
-LIMIT 20
-"""
-
+#
+#   SELECT ?ingredientName ?measure
+#   WHERE {
+#       ?meal a recipe:Meal ;
+#             recipe:hasName ?mealName ;
+#             recipe:hasIngredientUsage ?usage .
+#       ?usage recipe:ingredientMeasure ?measure ;
+#              recipe:usesIngredient ?ingredient .
+#       ?ingredient recipe:ingredientName ?ingredientName .
+#   }
+#   LIMIT 20
 print("\n=== Query 3: Sample Ingredients ===")
-results = g.query(query3)
-for row in results:
-    print(f"  {row.ingredientName}: {row.measure}")
+ingredients = (
+    (ingredient_name, measure)
+    for meal in g.subjects(RDF.type, RECIPE.Meal)
+    if (meal, RECIPE.hasName, None) in g
+    for usage in g.objects(meal, RECIPE.hasIngredientUsage)
+    for measure in g.objects(usage, RECIPE.ingredientMeasure)
+    for ingredient in g.objects(usage, RECIPE.usesIngredient)
+    for ingredient_name in g.objects(ingredient, RECIPE.ingredientName)
+)
+for ingredient_name, measure in islice(ingredients, 20):
+    print(f"  {ingredient_name}: {measure}")
 
 # Query 4: Count meals by category
-query4 = """
-PREFIX recipe: <http://example.org/recipe/>
-PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-SELECT ?category (COUNT(?meal) as ?count)
-WHERE {
-    ?meal a recipe:Meal ;
-          recipe:belongsToCategory ?cat .
-    ?cat rdfs:label ?category .
-}
-GROUP BY ?category
-ORDER BY DESC(?count)
-"""
-
+#
+#   SELECT ?category (COUNT(?meal) as ?count)
+#   WHERE {
+#       ?meal a recipe:Meal ;
+#             recipe:belongsToCategory ?cat .
+#       ?cat rdfs:label ?category .
+#   }
+#   GROUP BY ?category
+#   ORDER BY DESC(?count)
 print("\n=== Query 4: Meals by Category ===")
-results = g.query(query4)
-for row in results:
-    print(f"  {row.category}: {row.count} meals")
+category_counts = Counter(
+    category
+    for meal, cat in g.subject_objects(RECIPE.belongsToCategory)
+    if (meal, RDF.type, RECIPE.Meal) in g
+    for category in g.objects(cat, RDFS.label)
+)
+for category, count in category_counts.most_common():
+    print(f"  {category}: {count} meals")
 
 # Query 5: Find meals with specific ingredient
-query5 = """
-PREFIX recipe: <http://example.org/recipe/>
-
-SELECT DISTINCT ?mealName
-WHERE {
-    ?meal a recipe:Meal ;
-          recipe:hasName ?mealName ;
-          recipe:hasIngredient ?ingredient .
-    ?ingredient recipe:ingredientName ?ingredientName .
-    FILTER(CONTAINS(LCASE(?ingredientName), "chicken"))
-}
-"""
-
+#
+#   SELECT DISTINCT ?mealName
+#   WHERE {
+#       ?meal a recipe:Meal ;
+#             recipe:hasName ?mealName ;
+#             recipe:hasIngredient ?ingredient .
+#       ?ingredient recipe:ingredientName ?ingredientName .
+#       FILTER(CONTAINS(LCASE(?ingredientName), "chicken"))
+#   }
 print("\n=== Query 5: Meals with Chicken ===")
-results = g.query(query5)
-for row in results:
-    print(f"  {row.mealName}")
\ No newline at end of file
+chicken_meals = {}  # insertion-ordered set of names
+for ingredient, ingredient_name in g.subject_objects(RECIPE.ingredientName):
+    if "chicken" in ingredient_name.lower():
+        for meal in g.subjects(RECIPE.hasIngredient, ingredient):
+            if (meal, RDF.type, RECIPE.Meal) in g:
+                chicken_meals.update(
+                    dict.fromkeys(g.objects(meal, RECIPE.hasName))
+                )
+for meal_name in chicken_meals:
+    print(f"  {meal_name}")